@@ -594,45 +594,68 @@ def main():
         default=None,
         help='Number of files to download (prod mode only). Will press left arrow this many times + 1'
     )
+    parser.add_argument(
+        '--chats',
+        nargs='+',
+        default=None,
+        help='Several chats to process one after another in a single run (overrides --chat)'
+    )
+    parser.add_argument(
+        '--file-counts',
+        nargs='+',
+        type=int,
+        default=None,
+        help='File count for each chat in --chats, in the same order (prod mode only)'
+    )
     
     args = parser.parse_args()
     
+    # List of (chat, file_count) to process in this run
+    if args.chats:
+        if args.file_counts and len(args.file_counts) != len(args.chats):
+            parser.error('--file-counts needs one value per chat in --chats')
+        jobs = list(zip(args.chats, args.file_counts or [None] * len(args.chats)))
+    else:
+        jobs = [(args.chat, args.file_count)]
+    
     navigator = WeChatNavigator()
     
-    print(f"Attempting to navigate to '{args.chat}' chat...")
-    if args.click_image:
-        if args.prod:
-            if args.file_count:
-                print(f"Will search for and click on an image, then press left arrow {args.file_count + 1} times")
-                print(f"Production mode: File count = {args.file_count}")
-            else:
-                print("Will search for and click on an image, then continuously navigate")
-                print("Production mode: Will monitor for new .dat files and keep going")
-        else:
-            print("Will search for and click on an image in the chat")
     print("Make sure WeChat is open and visible!")
     print(f"\nStarting in {args.delay} seconds...")
     time.sleep(args.delay)
     
-    success = navigator.navigate_to_chat(args.chat, click_image=args.click_image, prod_mode=args.prod, file_count=args.file_count)
-    
-    if success:
+    for chat, file_count in jobs:
+        print(f"Attempting to navigate to '{chat}' chat...")
         if args.click_image:
             if args.prod:
-                print(f"\n✓ Successfully navigated to '{args.chat}' chat and completed production run!")
+                if file_count:
+                    print(f"Will search for and click on an image, then press left arrow {file_count + 1} times")
+                    print(f"Production mode: File count = {file_count}")
+                else:
+                    print("Will search for and click on an image, then continuously navigate")
+                    print("Production mode: Will monitor for new .dat files and keep going")
+            else:
+                print("Will search for and click on an image in the chat")
+        
+        success = navigator.navigate_to_chat(chat, click_image=args.click_image, prod_mode=args.prod, file_count=file_count)
+        
+        if success:
+            if args.click_image:
+                if args.prod:
+                    print(f"\n✓ Successfully navigated to '{chat}' chat and completed production run!")
+                else:
+                    print(f"\n✓ Successfully navigated to '{chat}' chat and found image!")
             else:
-                print(f"\n✓ Successfully navigated to '{args.chat}' chat and found image!")
+                print(f"\n✓ Successfully navigated to '{chat}' chat!")
         else:
-            print(f"\n✓ Successfully navigated to '{args.chat}' chat!")
-    else:
-        print(f"\n✗ Failed to complete task.")
-        print("\nTroubleshooting tips:")
-        print("1. Make sure WeChat is open and visible")
-        print("2. Try manually opening WeChat and ensuring it's in focus")
-        print("3. Check if the chat name matches exactly")
-        if args.click_image:
-            print("4. Make sure there's an image visible near the bottom of the chat")
-            print("5. Try scrolling the chat to show recent images")
+            print(f"\n✗ Failed to complete task for '{chat}'.")
+            print("\nTroubleshooting tips:")
+            print("1. Make sure WeChat is open and visible")
+            print("2. Try manually opening WeChat and ensuring it's in focus")
+            print("3. Check if the chat name matches exactly")
+            if args.click_image:
+                print("4. Make sure there's an image visible near the bottom of the chat")
+                print("5. Try scrolling the chat to show recent images")
 
 
 if __name__ == "__main__":
@@ -665,6 +688,13 @@ COMMAND LINE OPTIONS:
     Supports English, Chinese, and mixed names
     Use quotes if name contains spaces
 
+--chats <name> [<name> ...]
+    Several chats to process one after another in a single run (overrides --chat).
+    Used by wechat_file_monitor when more than one chat is ready at once.
+
+--file-counts <n> [<n> ...]
+    File count for each chat in --chats, in the same order (prod mode only)
+
 --delay <seconds>
     Delay in seconds before starting the automation.
     Default: 3 seconds
@@ -708,7 +738,10 @@ USAGE EXAMPLES:
 7. Production mode with custom chat:
    python wechat_auto_navigator.py --chat "Wairau" --prod --delay 5
 
-8. Using the batch file (Windows):
+8. Production mode for several chats in one run:
+   python wechat_auto_navigator.py --prod --chats "Henderson" "Wairau" --file-counts 23 5
+
+9. Using the batch file (Windows):
    run_wechat_navigator.bat
    run_wechat_navigator.bat "ChatName"
    run_wechat_navigator.bat "太平 Meadowland 3"
@@ -0,0 +1,125 @@
+import os
+import sys
+import mmap
+from wechat_decoder import decode_wechat_dat, decode_wechat_dat_mv
+
+# Import auto-annotation module from asian_grocer_scrapers repo
+sys.path.insert(0, r'C:\Users\henry\source\repos\asian_grocer_scrapers')
+try:
+    from auto_annotator import auto_annotate_duplicate_image
+    AUTO_ANNOTATION_AVAILABLE = True
+except ImportError:
+    AUTO_ANNOTATION_AVAILABLE = False
+
+# Annotator bound once so the decode path tests a single local-module name
+_ANNOTATE = auto_annotate_duplicate_image if AUTO_ANNOTATION_AVAILABLE else None
+
+# Auto-annotation data files (in the asian_grocer_scrapers repo)
+ANNOTATIONS_FILE = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\image_annotations.json'
+DUPLICATES_REPORT = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\duplicates_report.txt'
+STORE_DATE_RULES = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache\store_date_rules.csv'
+
+# Output folders this process has already created (os.makedirs stats every ancestor even with exist_ok)
+_MADE_DIRS = set()
+
+# Windows-only open flag for FILE_FLAG_SEQUENTIAL_SCAN (0 elsewhere; POSIX gets posix_fadvise instead)
+_O_SEQUENTIAL = getattr(os, 'O_SEQUENTIAL', 0)
+
+
+def _output_is_up_to_date(output_path, source_mtime, source_size):
+    """Check if a decoded .jpg already exists, is at least as new as its .dat source and is complete
+    
+    XOR decoding keeps the length, so an output of a different size is a truncated or stale decode.
+    """
+    try:
+        output_stat = os.stat(output_path)
+    except FileNotFoundError:
+        return False
+    return output_stat.st_mtime >= source_mtime and output_stat.st_size == source_size
+
+
+def _open_sequential(path, flags):
+    """open() opener that asks Windows for read-ahead tuned to a single front-to-back pass"""
+    return os.open(path, flags | _O_SEQUENTIAL)
+
+
+def _decode_mmap(file_path, output_path):
+    """Decode a .dat file through a read-only memory map instead of reading it into a buffer
+    
+    The image is written to a temporary file and moved into place, so a crash or kill
+    mid-decode never leaves a truncated output_path behind.
+    """
+    temp_path = output_path + '.part'
+    try:
+        _decode_mmap_to(file_path, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _decode_mmap_to(file_path, output_path):
+    """Write the decoded image for a .dat file to output_path (see _decode_mmap)"""
+    with open(file_path, 'rb', opener=_open_sequential) as f:
+        if hasattr(os, 'posix_fadvise'):
+            # Hint the kernel that the file is read once, front to back
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped; fall back to the plain byte read
+            decode_wechat_dat(file_path, output_path)
+            return
+        with mapped:
+            with memoryview(mapped) as data_view:
+                decode_wechat_dat_mv(data_view, output_path)
+        if hasattr(os, 'posix_fadvise'):
+            # Source is never read again - let its pages go instead of crowding out the next files
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _decode_worker(file_path, output_path, store_name):
+    """Decode a .dat file and auto-annotate the result (runs in a worker process)
+    
+    Only takes and returns plain values so it can be sent to a ProcessPoolExecutor.
+    
+    Returns:
+        True if the decoded image was auto-annotated
+    """
+    _decode_mmap(file_path, output_path)
+    
+    # Auto-annotate if available and store name exists (the decode above either wrote output_path or raised)
+    if _ANNOTATE is not None and store_name:
+        try:
+            return bool(_ANNOTATE(output_path, store_name, ANNOTATIONS_FILE, DUPLICATES_REPORT, STORE_DATE_RULES))
+        except Exception:
+            pass  # Don't fail decoding if annotation fails
+    return False
+
+
+def _decode_mirrored(file_path, source_root, output_base, store_name, source_mtime, source_size):
+    """Decode a .dat file into output_base, mirroring its path under source_root
+    
+    Path building, the up-to-date check and folder creation all happen here so
+    the watcher thread only has to submit the file.
+    
+    Returns:
+        (output_path, status) where status is 'up_to_date', 'decoded' or 'annotated'
+    """
+    # Create output path mirroring the folder structure
+    relative_path = os.path.relpath(file_path, source_root)
+    output_path = os.path.join(output_base, relative_path).replace(".dat", ".jpg")
+    
+    # Skip files already decoded on a previous run
+    if _output_is_up_to_date(output_path, source_mtime, source_size):
+        return output_path, 'up_to_date'
+    
+    output_dir = os.path.dirname(output_path)
+    if output_dir not in _MADE_DIRS:
+        os.makedirs(output_dir, exist_ok=True)
+        _MADE_DIRS.add(output_dir)
+    annotated = _decode_worker(file_path, output_path, store_name)
+    return output_path, 'annotated' if annotated else 'decoded'
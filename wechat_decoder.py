@@ -8,20 +8,37 @@ input_folder = r"C:\Users\henry\OneDrive\Documents\WeChat Files\wxid_5zk2tbe173u
 output_base = r"C:\Users\henry\OneDrive\Documents\WeChat Decoded Images2"
 os.makedirs(output_base, exist_ok=True)
 
+# Bytes decoded per write when reading from a memory map (bounds the copy made per slice)
+DECODE_CHUNK_SIZE = 1024 * 1024
+
+
+def _xor_table(key):
+    """Byte lookup table mapping every byte value to value ^ key (used with bytes.translate)"""
+    return bytes(b ^ key for b in range(256))
+
 
 def decode_wechat_dat(input_path, output_path):
     with open(input_path, "rb") as f:
-        data = bytearray(f.read())
+        data = f.read()
 
     # Guess XOR key using first byte
     key = data[0] ^ 0xFF
 
-    # Decode
-    for i in range(len(data)):
-        data[i] ^= key
+    # Decode with a byte lookup table instead of a per-byte Python loop
+    with open(output_path, "wb") as f:
+        f.write(data.translate(_xor_table(key)))
+
+
+def decode_wechat_dat_mv(data_view, output_path):
+    """Decode a .dat file already mapped into memory (e.g. a memoryview of an mmap)"""
+    # Guess XOR key using first byte
+    key = data_view[0] ^ 0xFF
+    xor_table = _xor_table(key)
 
+    # Translate one slice at a time, so only a chunk is ever copied out of the mapping
     with open(output_path, "wb") as f:
-        f.write(data)
+        for start in range(0, len(data_view), DECODE_CHUNK_SIZE):
+            f.write(bytes(data_view[start:start + DECODE_CHUNK_SIZE]).translate(xor_table))
 
 
 if __name__ == "__main__":
@@ -5,21 +5,54 @@ import csv
 import threading
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor
-from watchdog.observers import Observer
+import atexit
+import queue
+import logging
+import logging.handlers
+import sqlite3
+import signal
+import re
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 from datetime import datetime, timedelta
-from wechat_decoder import decode_wechat_dat
-from collections import defaultdict
+from wechat_decode_worker import _decode_mirrored, AUTO_ANNOTATION_AVAILABLE
+from collections import defaultdict, OrderedDict, deque
 
-# Import auto-annotation module from asian_grocer_scrapers repo
-sys.path.insert(0, r'C:\Users\henry\source\repos\asian_grocer_scrapers')
+# C-level reentrant lock for the per-event critical sections (falls back to threading.RLock)
 try:
-    from auto_annotator import auto_annotate_duplicate_image
-    AUTO_ANNOTATION_AVAILABLE = True
+    from fastrlock.rlock import FastRLock
 except ImportError:
-    AUTO_ANNOTATION_AVAILABLE = False
-    print("[Warning] Auto-annotation module not available")
+    FastRLock = threading.RLock
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves %-formatting to the listener thread"""
+    
+    def prepare(self, record):
+        return record
+
+
+class _BatchedStreamHandler(logging.StreamHandler):
+    """StreamHandler that flushes once the log queue is drained instead of after every record"""
+    
+    def flush(self):
+        if _log_queue.empty():
+            super().flush()
+
+
+# Hot-path log lines are queued and written to the console by a background listener,
+# so detection and decoding never wait on console output; a burst is written out in one flush.
+# The listener is started by start_monitoring, not at import: spawned decode workers
+# re-import this script and must not each start their own listener thread
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _BatchedStreamHandler(sys.stdout))
+
+logger = logging.getLogger('wechat')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(_DeferredQueueHandler(_log_queue))
 
 # Folders to monitor
 MONITOR_FOLDER = r"C:\Users\henry\OneDrive\Documents\WeChat Files\wxid_5zk2tbe173ua22\FileStorage\MsgAttach"
@@ -29,66 +62,202 @@ CSV_FILE = "wechat_folder_mappings.csv"
 # Output folder for decoded images
 OUTPUT_BASE = r"C:\Users\henry\OneDrive\Documents\WeChat Decoded Images2"
 
+# Already-decoded .dat paths are remembered here across restarts (MsgAttach mode)
+PROCESSED_DB = "processed_files.db"
+PROCESSED_FLUSH_INTERVAL = 1  # Seconds between batched writes to PROCESSED_DB
+PROCESSED_CACHE_SIZE = 50_000  # Max processed paths kept in memory
+
+# Path filters (checked for every file event, so computed once)
+_DAT_SUFFIXES = ('.dat', '.DAT', '.Dat')  # str.endswith on a tuple, no lower-cased copy per path
+_IMAGE_SEG = os.sep + 'Image' + os.sep
+
+# Startup scan
+SCAN_PROGRESS_EVERY = 500  # Log a running total after this many found files
+
+# Async decoding (msgattach mode)
+DECODE_WORKERS = min(os.cpu_count() or 1, 61)  # Worker processes (Windows allows at most 61)
+DECODE_QUEUE_SIZE = DECODE_WORKERS * 2  # Max decodes pending before new files wait to be submitted
+
 # Configuration for auto-navigation queue
 IDLE_THRESHOLD_SECONDS = 60  # Process folder after 60 seconds of no activity
 QUEUE_CHECK_INTERVAL = 5  # Check queue every 5 seconds
 MIN_FILES_TO_PROCESS = 1  # Minimum files before processing
+NAVIGATOR_TIMEOUT_SECONDS = 600  # Per chat in a navigator run (10 minutes)
+# Navigator run per batch of ready chats, with this interpreter (not whatever 'python' is first on PATH)
+NAVIGATOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wechat_auto_navigator.py')
+
+# Native watchdog backend for this platform (kernel-pushed events instead of stat polling)
+if sys.platform == 'win32':
+    from watchdog.observers import winapi
+    from watchdog.observers.read_directory_changes import WindowsApiObserver as NativeObserver
+    
+    # Only ask ReadDirectoryChangesW for name/size/write changes. watchdog's default mask also
+    # includes last-access, attribute and security changes, which fire for every .dat file we read
+    # and decode and only produce on_modified callbacks that processed_files then drops.
+    # Applied to winapi by start_monitoring (not at import, which decode workers repeat)
+    WATCHDOG_NOTIFY_FLAGS = (
+        winapi.FILE_NOTIFY_CHANGE_FILE_NAME
+        | winapi.FILE_NOTIFY_CHANGE_DIR_NAME
+        | winapi.FILE_NOTIFY_CHANGE_SIZE
+        | winapi.FILE_NOTIFY_CHANGE_LAST_WRITE
+    )
+elif sys.platform.startswith('linux'):
+    from watchdog.observers.inotify import InotifyObserver as NativeObserver
+else:
+    from watchdog.observers import Observer as NativeObserver
+
+POLLING_OBSERVER_TIMEOUT = 2.0  # Seconds between stat sweeps with --polling (network shares)
+
+# Polling backup (only runs for OneDrive placeholder folders)
+POLL_INTERVAL_SECONDS = 30  # Seconds between polling sweeps
+POLL_QUIET_SECONDS = 60  # Only sweep a folder after this long without a .dat event (events are getting through)
+FILE_ATTRIBUTE_RECALL_ON_DATA_ACCESS = 0x00400000  # OneDrive Files On-Demand placeholder flag
+INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+
+# Folder ID -> store name mappings from CSV_FILE, re-parsed only when its mtime changes
+_CSV_CACHE = {'mtime': None, 'map': {}}
+_CSV_CACHE_LOCK = threading.Lock()
+
+
+def _get_folder_map():
+    """Return the cached folder ID -> store name mapping from CSV_FILE
+    
+    The dict is updated in place on reload, so references held elsewhere stay current.
+    """
+    try:
+        mtime = os.stat(CSV_FILE).st_mtime
+    except OSError:
+        return _CSV_CACHE['map']
+    
+    if mtime != _CSV_CACHE['mtime']:
+        with _CSV_CACHE_LOCK:
+            if mtime != _CSV_CACHE['mtime']:
+                _CSV_CACHE['mtime'] = mtime
+                try:
+                    mappings = {}
+                    with open(CSV_FILE, 'r', encoding='utf-8', newline='') as f:
+                        reader = csv.reader(f)
+                        header = next(reader)
+                        folder_idx, store_idx = header.index('Folder'), header.index('Store')
+                        for row in reader:
+                            if len(row) > max(folder_idx, store_idx):
+                                mappings[row[folder_idx]] = row[store_idx]
+                except Exception as e:
+                    logger.info("Error reading %s: %s", CSV_FILE, e)
+                    return _CSV_CACHE['map']
+                
+                folder_map = _CSV_CACHE['map']
+                for folder_id in folder_map.keys() - mappings.keys():
+                    del folder_map[folder_id]
+                folder_map.update(mappings)
+    
+    return _CSV_CACHE['map']
+
+
+# Chat folder ID extraction from paths like .../MsgAttach/<folder_id>/Thumb/2025-11/file.dat
+_BASE_PREFIX = BASE_THUMB_PATH + os.sep
+_SEP = re.escape(os.sep)
+_MSGATTACH_RE = re.compile(r'(?:^|' + _SEP + r')MsgAttach' + _SEP + r'([^' + _SEP + r']+)')
+
+
+def _folder_id_from_path(file_path):
+    """Get the chat folder ID from a path under MsgAttach (None if not under MsgAttach)"""
+    if file_path.startswith(_BASE_PREFIX):
+        # Slice up to the next separator instead of splitting the rest of the path
+        start = len(_BASE_PREFIX)
+        end = file_path.find(os.sep, start)
+        return file_path[start:end if end != -1 else None] or None
+    
+    # Not under BASE_THUMB_PATH (e.g. another account's folder). Files normally sit at
+    # .../MsgAttach/<folder_id>/Thumb|Image/YYYY-MM/file.dat, so split off just that tail
+    parts = file_path.rsplit(os.sep, 4)
+    if len(parts) == 5 and (parts[0] == 'MsgAttach' or parts[0].endswith(os.sep + 'MsgAttach')):
+        return parts[1]
+    
+    # Any other depth - find the MsgAttach segment
+    match = _MSGATTACH_RE.search(file_path)
+    return match.group(1) if match else None
+
+
+def _store_name_from_path(file_path):
+    """Get the store name for a path under MsgAttach (the folder ID if unmapped, None if not under MsgAttach)"""
+    folder_id = _folder_id_from_path(file_path)
+    if folder_id is None:
+        return None
+    # Goes through _get_folder_map (one stat of CSV_FILE) so mapping edits apply without a restart
+    return _get_folder_map().get(folder_id, folder_id)
+
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Last (whole second, formatted string) from _format_ts, kept separately for the current time
+# and for file mtimes so the two calls made per file don't keep evicting each other
+_LAST_FORMATTED = {'now': (None, ''), 'file': (None, '')}
+
+
+def _format_ts(ts=None):
+    """Format a Unix timestamp (default: now) as local time, reusing the result within the same second"""
+    key = 'now' if ts is None else 'file'
+    second = int(time.time() if ts is None else ts)
+    cached_second, formatted = _LAST_FORMATTED[key]
+    if second != cached_second:
+        formatted = time.strftime(TIME_FORMAT, time.localtime(second))
+        _LAST_FORMATTED[key] = (second, formatted)  # Item swap is atomic across handler threads
+    return formatted
 
 
 class FolderActivityTracker:
     """Tracks activity for each folder to determine when to process"""
     
     def __init__(self):
-        self.folder_last_activity = {}  # folder_id -> datetime
+        self.folder_last_activity = {}  # folder_id -> time.monotonic() of last file
         self.folder_file_counts = defaultdict(int)  # folder_id -> count
-        self.folder_to_store = {}  # folder_id -> store_name (from CSV)
-        self.lock = threading.Lock()
-        self.load_folder_mappings()
+        self.folder_to_store = _get_folder_map()  # folder_id -> store_name (shared CSV cache)
+        self.pending = deque()  # (folder_id, time.monotonic()) not yet applied; appends are atomic
+        self.lock = FastRLock()
+        if self.folder_to_store:
+            logger.info("[Activity Tracker] Loaded %d folder mappings from CSV", len(self.folder_to_store))
+        else:
+            logger.info("[Warning] %s not found for folder mappings", CSV_FILE)
     
-    def load_folder_mappings(self):
-        """Load folder ID to store name mappings from CSV"""
-        if not os.path.exists(CSV_FILE):
-            print(f"[Warning] {CSV_FILE} not found for folder mappings")
-            return
+    def record_activity(self, file_path):
+        """Record a new file for its folder without taking the lock
         
-        try:
-            with open(CSV_FILE, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    folder_id = row['Folder']
-                    store_name = row['Store']
-                    self.folder_to_store[folder_id] = store_name
-            print(f"[Activity Tracker] Loaded {len(self.folder_to_store)} folder mappings from CSV")
-        except Exception as e:
-            print(f"[Activity Tracker] Error loading CSV: {e}")
-    
-    def update_activity(self, file_path):
-        """Update activity timestamp for a folder based on file path"""
+        Updates are applied in batches by apply_pending.
+        """
         # Extract folder ID from path like: .../MsgAttach/abc123/Thumb/2025-11/file.dat
-        try:
-            parts = file_path.split(os.sep)
-            # Find MsgAttach index and get folder ID after it
-            if 'MsgAttach' in parts:
-                msgattach_idx = parts.index('MsgAttach')
-                if msgattach_idx + 1 < len(parts):
-                    folder_id = parts[msgattach_idx + 1]
-                    
-                    with self.lock:
-                        self.folder_last_activity[folder_id] = datetime.now()
-                        self.folder_file_counts[folder_id] += 1
-                        
-                        # Get store name if available
-                        store_name = self.folder_to_store.get(folder_id, folder_id)
-                        return folder_id, store_name
-        except Exception as e:
-            pass
-        return None, None
+        folder_id = _folder_id_from_path(file_path)
+        if folder_id is not None:
+            self.pending.append((folder_id, time.monotonic()))
+        return folder_id
+    
+    def apply_pending(self):
+        """Apply all recorded activity under a single lock acquisition
+        
+        Returns:
+            Dict of folder_id -> number of new files applied
+        """
+        new_files = defaultdict(int)
+        with self.lock:
+            while True:
+                try:
+                    folder_id, activity_time = self.pending.popleft()
+                except IndexError:
+                    break
+                self.folder_last_activity[folder_id] = activity_time
+                self.folder_file_counts[folder_id] += 1
+                new_files[folder_id] += 1
+        return new_files
+    
+    def get_last_activity(self, folder_id):
+        """Get time.monotonic() of the last file for a folder (None if no activity)"""
+        with self.lock:
+            return self.folder_last_activity.get(folder_id)
     
     def get_idle_time(self, folder_id):
         """Get seconds since last activity for a folder"""
         with self.lock:
             if folder_id in self.folder_last_activity:
-                return (datetime.now() - self.folder_last_activity[folder_id]).total_seconds()
+                return time.monotonic() - self.folder_last_activity[folder_id]
         return float('inf')
     
     def get_file_count(self, folder_id):
@@ -114,14 +283,154 @@ class FolderActivityTracker:
             return list(self.folder_last_activity.keys())
 
 
+class BoundedSet:
+    """Set of paths that forgets its oldest entries once it holds more than maxlen
+    
+    Each path can carry a value (see get), so it also serves as a bounded cache.
+    """
+    
+    def __init__(self, maxlen=PROCESSED_CACHE_SIZE):
+        self.maxlen = maxlen
+        self.items = OrderedDict()
+    
+    def __contains__(self, item):
+        return item in self.items
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def get(self, item, default=None):
+        """Get the value stored with an item"""
+        return self.items.get(item, default)
+    
+    def add(self, item, value=None):
+        """Add an item (or refresh it and its value), evicting the oldest one when over capacity
+        
+        Returns True if the item wasn't already in the set.
+        """
+        if item in self.items:
+            self.items[item] = value
+            self.items.move_to_end(item)
+            return False
+        self.items[item] = value
+        if len(self.items) > self.maxlen:
+            self.items.popitem(last=False)
+        return True
+
+
+class ProcessedFileSet:
+    """Set of seen file paths, with decoded sources persisted to SQLite so restarts don't redo work
+    
+    add() only marks a path as seen in a bounded in-memory set, so one run doesn't
+    handle it twice. mark_decoded() records the source's mtime and size in the
+    database (in batches, by a background thread); is_decoded() only trusts that
+    record while the source still has the same mtime and size, so a file that was
+    decoded while WeChat was still writing it is decoded again on restart. Files
+    that were skipped, failed to decode or were still pending at exit are never
+    recorded. The most recently decoded records are cached in memory at startup;
+    older paths are looked up in the database.
+    """
+    
+    def __init__(self, db_path=PROCESSED_DB, flush_interval=PROCESSED_FLUSH_INTERVAL, cache_size=PROCESSED_CACHE_SIZE):
+        self.paths = BoundedSet(cache_size)  # Seen by this run
+        self.decoded = BoundedSet(cache_size)  # path -> (source mtime, source size) when decoded
+        self.pending = []  # (path, mtime, size, timestamp) not yet written to the database
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # The old table only held decode times, not the source stat, so its rows can't be trusted
+        self.conn.execute('DROP TABLE IF EXISTS processed')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS decoded (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, ts REAL)')
+        # Lets the warm-up query below read the newest rows off the index instead of sorting the table
+        self.conn.execute('CREATE INDEX IF NOT EXISTS decoded_ts ON decoded (ts)')
+        
+        # Warm the cache with the newest records, oldest first so eviction order is kept
+        # Iterate the cursor directly rather than building the whole list with fetchall()
+        recent = self.conn.execute(
+            'SELECT path, mtime, size FROM (SELECT path, mtime, size, ts FROM decoded ORDER BY ts DESC LIMIT ?) ORDER BY ts',
+            (cache_size,))
+        for path, mtime, size in recent:
+            self.decoded.add(path, (mtime, size))
+        total = self.conn.execute('SELECT COUNT(*) FROM decoded').fetchone()[0]
+        logger.info("[Processed Files] Loaded %d of %d processed file(s) from %s", len(self.decoded), total, db_path)
+        
+        self.stop_event = threading.Event()
+        self.flush_thread = threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True)
+        self.flush_thread.start()
+    
+    def __contains__(self, path):
+        return path in self.paths
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    def add(self, path):
+        """Mark a path as seen for this run (not persisted)
+        
+        Returns True if the path wasn't already in the recent set.
+        """
+        return self.paths.add(path)
+    
+    def is_decoded(self, path, file_stat):
+        """Check if a path was decoded from a source with the same mtime and size as file_stat"""
+        record = self.decoded.get(path)
+        if record is None:
+            # Not in the recent cache - fall back to the database
+            with self.db_lock:
+                record = self.conn.execute('SELECT mtime, size FROM decoded WHERE path = ?', (path,)).fetchone()
+            if record is None:
+                return False
+            self.decoded.add(path, record)
+        return record == (file_stat.st_mtime, file_stat.st_size)
+    
+    def mark_decoded(self, path, source_mtime, source_size):
+        """Record a path as decoded from a source with this mtime and size (written on the next flush)"""
+        self.decoded.add(path, (source_mtime, source_size))
+        with self.lock:
+            self.pending.append((path, source_mtime, source_size, time.time()))
+    
+    def flush(self):
+        """Write pending paths to the database in a single transaction"""
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        
+        with self.db_lock:
+            try:
+                self.conn.execute('BEGIN')
+                self.conn.executemany('INSERT OR REPLACE INTO decoded VALUES (?, ?, ?, ?)', batch)
+                self.conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.execute('ROLLBACK')
+                logger.info("[Processed Files] Error saving %d path(s): %s", len(batch), e)
+    
+    def _flush_loop(self, flush_interval):
+        """Background thread that flushes pending paths periodically"""
+        while not self.stop_event.wait(flush_interval):
+            self.flush()
+    
+    def close(self):
+        """Stop the flush thread, write any remaining paths and close the database"""
+        self.stop_event.set()
+        self.flush_thread.join()
+        self.flush()
+        with self.db_lock:
+            self.conn.close()
+
+
 class ProcessingQueue:
     """Manages queue of folders to process"""
     
     def __init__(self, activity_tracker):
         self.queue_items = {}  # folder_id -> QueueItem
-        self.currently_processing = None
+        self._heap = []  # (last_activity, folder_id), oldest activity first; stale entries skipped on pop
+        self.currently_processing = set()  # Folder IDs in the running navigator batch
         self.needs_reprocessing = set()
-        self.lock = threading.Lock()
+        self.lock = FastRLock()
         self.activity_tracker = activity_tracker
     
     def add_or_update(self, folder_id, store_name):
@@ -130,61 +439,92 @@ class ProcessingQueue:
             if folder_id not in self.queue_items:
                 self.queue_items[folder_id] = {
                     'store_name': store_name,
-                    'added_at': datetime.now()
+                    'added_at': time.monotonic()
                 }
+            # Re-push on every update; the entry with the older activity time becomes stale
+            last_activity = self.activity_tracker.get_last_activity(folder_id)
+            if last_activity is not None:
+                heapq.heappush(self._heap, (last_activity, folder_id))
+    
+    def apply_pending_activity(self):
+        """Apply batched file activity from the tracker and queue the affected folders"""
+        for folder_id, new_files in self.activity_tracker.apply_pending().items():
+            store_name = self.activity_tracker.get_store_name(folder_id)
+            self.add_or_update(folder_id, store_name)
+            file_count = self.activity_tracker.get_file_count(folder_id)
+            
+            # Check if currently processing this folder
+            if self.mark_new_activity_during_processing(folder_id):
+                logger.info("[Queue] ⚠️  %s: +%d file(s) while processing - will re-queue after completion", store_name, new_files)
+            else:
+                queue_pos = len(self.queue_items)
+                logger.info("[Queue] ⏭️  %s: +%d file(s), added to processing queue (position: %d, %d files total)",
+                            store_name, new_files, queue_pos, file_count)
     
     def mark_new_activity_during_processing(self, folder_id):
         """Mark that a folder received new activity while being processed"""
         with self.lock:
-            if self.currently_processing == folder_id:
+            if folder_id in self.currently_processing:
                 self.needs_reprocessing.add(folder_id)
                 return True
         return False
     
-    def get_next_to_process(self):
-        """Get next folder that's idle and ready to process"""
+    def get_all_ready_to_process(self):
+        """Get all folders that are idle and ready to process, longest idle first
+        
+        They are processed together in one navigator run.
+        """
         with self.lock:
             if self.currently_processing:
-                return None  # Already processing something
+                return []  # Already processing a batch
             
-            # Find folders that are idle and have enough files
-            candidates = []
-            for folder_id in self.queue_items.keys():
-                idle_time = self.activity_tracker.get_idle_time(folder_id)
-                file_count = self.activity_tracker.get_file_count(folder_id)
+            # Pop every idle folder that has enough files
+            now = time.monotonic()
+            ready = []
+            too_few_files = []
+            while self._heap:
+                last_activity, folder_id = self._heap[0]
+                if (folder_id not in self.queue_items
+                        or self.activity_tracker.get_last_activity(folder_id) != last_activity):
+                    heapq.heappop(self._heap)  # Stale entry (folder processed or active again since)
+                    continue
                 
-                if idle_time >= IDLE_THRESHOLD_SECONDS and file_count >= MIN_FILES_TO_PROCESS:
-                    candidates.append((folder_id, idle_time, file_count))
-            
-            if not candidates:
-                return None
+                idle_time = now - last_activity
+                if idle_time < IDLE_THRESHOLD_SECONDS:
+                    break  # Every remaining folder has been idle for less time
+                
+                heapq.heappop(self._heap)
+                file_count = self.activity_tracker.get_file_count(folder_id)
+                if file_count >= MIN_FILES_TO_PROCESS:
+                    ready.append((folder_id, idle_time, file_count))
+                else:
+                    too_few_files.append((last_activity, folder_id))
             
-            # Sort by idle time (longest idle first)
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            folder_id, idle_time, file_count = candidates[0]
+            # Keep folders that are idle but still short of files for later checks
+            for entry in too_few_files:
+                heapq.heappush(self._heap, entry)
             
             # Mark as processing
-            self.currently_processing = folder_id
-            store_name = self.activity_tracker.get_store_name(folder_id)
+            self.currently_processing.update(folder_id for folder_id, _, _ in ready)
             
-            return {
+            return [{
                 'folder_id': folder_id,
-                'store_name': store_name,
+                'store_name': self.activity_tracker.get_store_name(folder_id),
                 'idle_time': idle_time,
                 'file_count': file_count
-            }
+            } for folder_id, idle_time, file_count in ready]
     
     def finish_processing(self, folder_id):
         """Mark folder as finished processing"""
         with self.lock:
-            if self.currently_processing == folder_id:
-                self.currently_processing = None
+            if folder_id in self.currently_processing:
+                self.currently_processing.discard(folder_id)
                 
                 # Check if needs reprocessing
                 if folder_id in self.needs_reprocessing:
                     self.needs_reprocessing.remove(folder_id)
                     # Keep in queue for reprocessing
-                    print(f"[Queue] ↩️  {self.activity_tracker.get_store_name(folder_id)} will be reprocessed due to new activity")
+                    logger.info("[Queue] ↩️  %s will be reprocessed due to new activity", self.activity_tracker.get_store_name(folder_id))
                     return True  # Needs reprocessing
                 else:
                     # Remove from queue - successfully processed
@@ -207,7 +547,7 @@ class ProcessingQueue:
                     'store_name': store_name,
                     'file_count': file_count,
                     'idle_time': idle_time,
-                    'processing': folder_id == self.currently_processing
+                    'processing': folder_id in self.currently_processing
                 })
             
             # Sort by idle time
@@ -216,564 +556,421 @@ class ProcessingQueue:
 
 
 def get_all_thumb_folders():
-    """Read CSV and generate paths to all Thumb folders"""
-    thumb_folders = {}
+    """Read CSV and generate paths to all Thumb folders
     
+    Folder existence is checked later by start_monitoring.
+    """
     if not os.path.exists(CSV_FILE):
-        print(f"Warning: {CSV_FILE} not found. Using default folder only.")
+        logger.info("Warning: %s not found. Using default folder only.", CSV_FILE)
         return {}
     
+    return {
+        store_name: os.path.join(BASE_THUMB_PATH, folder_id, 'Thumb')
+        for folder_id, store_name in _get_folder_map().items()
+    }
+
+
+def create_observer(use_polling=False):
+    """Create a watchdog observer
+    
+    Uses the native backend (ReadDirectoryChangesW / inotify) unless use_polling
+    is set, which is only needed for network shares (NFS/CIFS) without change
+    notifications.
+    """
+    if use_polling:
+        return PollingObserver(timeout=POLLING_OBSERVER_TIMEOUT)
+    return NativeObserver()
+
+
+def is_onedrive_placeholder(path):
+    """Check if a folder is an OneDrive placeholder (Files On-Demand)
+    
+    Native change notifications are reliable on local NTFS folders; missed
+    events come from OneDrive placeholders, which are the only folders polled.
+    """
+    if sys.platform != 'win32':
+        return False
+    
     try:
-        with open(CSV_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                folder_id = row['Folder']
-                store_name = row['Store']
-                thumb_path = os.path.join(BASE_THUMB_PATH, folder_id, 'Thumb')
-                
-                # Only add if folder exists
-                if os.path.exists(thumb_path):
-                    thumb_folders[store_name] = thumb_path
-                else:
-                    print(f"Note: Thumb folder not found for {store_name}: {thumb_path}")
-        
-        return thumb_folders
-        
-    except Exception as e:
-        print(f"Error reading {CSV_FILE}: {e}")
-        return {}
+        import ctypes
+        from ctypes import wintypes
+        get_attributes = ctypes.windll.kernel32.GetFileAttributesW
+        get_attributes.argtypes = [wintypes.LPCWSTR]
+        get_attributes.restype = wintypes.DWORD
+        attributes = get_attributes(path)
+    except Exception:
+        return False
+    
+    if attributes == INVALID_FILE_ATTRIBUTES:
+        return False
+    return bool(attributes & FILE_ATTRIBUTE_RECALL_ON_DATA_ACCESS)
 
 
 class DatFileHandler(FileSystemEventHandler):
     """Handler for monitoring .dat file creation"""
     
-    def __init__(self, baseline_time, monitor_folder, decode_files=True, folder_label="", processed_files=None, executor=None, activity_tracker=None, processing_queue=None):
+    def __init__(self, baseline_time, monitor_folder, decode_files=True, folder_label="", processed_files=None, executor=None, decode_slots=None, activity_tracker=None, processing_queue=None):
         super().__init__()
         self.baseline_time = baseline_time
+        self.baseline_ts = baseline_time.timestamp()  # Compared against st_mtime directly
         self.monitor_folder = monitor_folder
         self.decode_files = decode_files
         self.folder_label = folder_label
-        self.processed_files = processed_files if processed_files is not None else set()
-        self.lock = threading.Lock()
-        self.executor = executor  # Thread pool for async decoding
+        self.processed_files = processed_files if processed_files is not None else BoundedSet()
+        self.executor = executor  # Process pool for async decoding
+        self.decode_slots = decode_slots  # Bounds decodes pending in the executor (shared by all handlers)
         self.activity_tracker = activity_tracker  # For thumbnail mode queue
         self.processing_queue = processing_queue  # For thumbnail mode queue
-        # Load folder mappings for msgattach mode
-        self.folder_to_store = self._load_folder_mappings() if decode_files else {}
+        self.last_event_time = float('-inf')  # time.monotonic() of the last watchdog event for a .dat file this handler handles
     
-    def _load_folder_mappings(self):
-        """Load folder ID to store name mappings from CSV"""
-        mappings = {}
-        if os.path.exists(CSV_FILE):
-            try:
-                with open(CSV_FILE, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        mappings[row['Folder']] = row['Store']
-            except Exception:
-                pass
-        return mappings
+    def _report_decode(self, file_path, store_name, file_stat, result=None, decode_error=None):
+        """Log the outcome of decoding a file (result is the (output_path, status) from _decode_mirrored)
+        
+        Successful and up-to-date decodes are also recorded in the processed-files database,
+        along with the source mtime and size they were decoded from (file_stat).
+        """
+        timestamp = _format_ts()
+        store_name_info = f" [{store_name}]" if store_name else ""
+        
+        if decode_error is not None:
+            logger.info("[%s]%s ✗ Decode failed for %s: %s", timestamp, store_name_info, file_path, decode_error)
+            return
+        
+        if isinstance(self.processed_files, ProcessedFileSet):
+            self.processed_files.mark_decoded(file_path, file_stat.st_mtime, file_stat.st_size)
+        
+        output_path, status = result
+        if status == 'up_to_date':
+            logger.info("[%s]%s ✓ Already decoded (up to date): %s", timestamp, store_name_info, output_path)
+            return
+        
+        logger.info("[%s]%s ✓ Decoded: %s", timestamp, store_name_info, output_path)
+        if status == 'annotated':
+            logger.info("  ✓ Auto-annotated: %s", os.path.basename(output_path))
     
-    def _get_store_name_from_path(self, file_path):
-        """Extract store name from file path"""
-        try:
-            parts = file_path.split(os.sep)
-            if 'MsgAttach' in parts:
-                msgattach_idx = parts.index('MsgAttach')
-                if msgattach_idx + 1 < len(parts):
-                    folder_id = parts[msgattach_idx + 1]
-                    return self.folder_to_store.get(folder_id, folder_id)
-        except Exception:
-            pass
-        return None
+    def _on_decode_done(self, future, file_path, store_name, file_stat):
+        """Called in the main process when a worker finishes decoding a file"""
+        self.decode_slots.release()
+        decode_error = future.exception()
+        if decode_error is not None:
+            self._report_decode(file_path, store_name, file_stat, decode_error=decode_error)
+        else:
+            self._report_decode(file_path, store_name, file_stat, future.result())
     
-    def decode_file_async(self, file_path, output_path):
-        """Decode a file asynchronously in the thread pool"""
+    def decode_file_async(self, file_path, file_stat, store_name):
+        """Decode a file in the worker process pool
+        
+        The worker works out the output path and creates its folder, so the
+        watcher thread only submits. Blocks while DECODE_QUEUE_SIZE decodes are
+        already pending, so a burst of files can't grow the submit queue without bound.
+        """
+        args = (file_path, self.monitor_folder, OUTPUT_BASE, store_name, file_stat.st_mtime, file_stat.st_size)
+        
+        if self.executor is None:
+            # Fallback to synchronous decoding if no executor
+            try:
+                result = _decode_mirrored(*args)
+            except Exception as decode_error:
+                self._report_decode(file_path, store_name, file_stat, decode_error=decode_error)
+            else:
+                self._report_decode(file_path, store_name, file_stat, result)
+            return
+        
+        self.decode_slots.acquire()
         try:
-            decode_wechat_dat(file_path, output_path)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Get store name for msgattach mode
-            store_name = self._get_store_name_from_path(file_path)
-            store_name_info = f" [{store_name}]" if store_name else ""
-            
-            print(f"[{timestamp}]{store_name_info} ✓ Decoded: {output_path}")
-            
-            # Auto-annotate if available and store name exists
-            if AUTO_ANNOTATION_AVAILABLE and store_name and os.path.exists(output_path):
-                try:
-                    # Set paths relative to asian_grocer_scrapers repo (using cache_data folder)
-                    annotations_file = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\image_annotations.json'
-                    duplicates_report = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\duplicates_report.txt'
-                    store_date_rules = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache\store_date_rules.csv'
-                    
-                    if auto_annotate_duplicate_image(output_path, store_name, annotations_file, 
-                                                     duplicates_report, store_date_rules):
-                        print(f"  ✓ Auto-annotated: {os.path.basename(output_path)}")
-                except Exception as annotate_error:
-                    # Don't fail decoding if annotation fails
-                    pass
-        except Exception as decode_error:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Get store name for msgattach mode
-            store_name = self._get_store_name_from_path(file_path)
-            store_name_info = f" [{store_name}]" if store_name else ""
-            
-            print(f"[{timestamp}]{store_name_info} ✗ Decode failed for {file_path}: {decode_error}")
+            future = self.executor.submit(_decode_mirrored, *args)
+        except Exception:
+            self.decode_slots.release()
+            raise
+        future.add_done_callback(lambda f: self._on_decode_done(f, file_path, store_name, file_stat))
     
     def on_created(self, event):
         """Called when a file or directory is created"""
-        if event.is_directory:
+        if event.is_directory or not event.src_path.endswith(_DAT_SUFFIXES):
             return
-        
-        # Check if it's a .dat file
-        if event.src_path.lower().endswith('.dat'):
-            # For msgattach mode, only decode files in Image folders
-            if self.decode_files and '\\Image\\' not in event.src_path:
-                return
-            
-            # Get file creation/modification time
-            try:
-                with self.lock:
-                    # Skip if already processed
-                    if event.src_path in self.processed_files:
-                        return
-                    self.processed_files.add(event.src_path)
-                
-                # For thumbnail mode (decode_files=False), check file size
-                if not self.decode_files:
-                    try:
-                        file_size = os.path.getsize(event.src_path)
-                        # Skip files larger than 15KB for thumbnail mode
-                        if file_size > 15 * 1024:  # 15KB in bytes
-                            return
-                    except Exception as size_error:
-                        # If we can't get size, skip the file
-                        return
-                
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(event.src_path))
-                
-                # Only report if file is newer than baseline
-                if file_mtime >= self.baseline_time:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    file_time_str = file_mtime.strftime("%Y-%m-%d %H:%M:%S")
-                    folder_info = f" [{self.folder_label}]" if self.folder_label else ""
-                    
-                    # Show file size for thumbnail mode
-                    size_info = ""
-                    if not self.decode_files:
-                        try:
-                            file_size = os.path.getsize(event.src_path)
-                            size_kb = file_size / 1024
-                            size_info = f" (size: {size_kb:.1f} KB)"
-                        except:
-                            pass
-                    
-                    # Get store name for msgattach mode
-                    store_name_info = ""
-                    if self.decode_files:
-                        store_name = self._get_store_name_from_path(event.src_path)
-                        if store_name:
-                            store_name_info = f" [{store_name}]"
-                    
-                    print(f"[{timestamp}]{folder_info}{store_name_info} New .dat file detected (on_created): {event.src_path}{size_info}")
-                    print(f"  File timestamp: {file_time_str}")
-                    
-                    # For thumbnail mode, update activity tracker and queue
-                    if not self.decode_files and self.activity_tracker and self.processing_queue:
-                        folder_id, store_name = self.activity_tracker.update_activity(event.src_path)
-                        if folder_id and store_name:
-                            self.processing_queue.add_or_update(folder_id, store_name)
-                            file_count = self.activity_tracker.get_file_count(folder_id)
-                            
-                            # Check if currently processing this folder
-                            if self.processing_queue.mark_new_activity_during_processing(folder_id):
-                                print(f"  ⚠️  Still processing - will re-queue after completion")
-                            else:
-                                queue_pos = len(self.processing_queue.queue_items)
-                                print(f"  ⏭️  Added to processing queue (position: {queue_pos}, {file_count} files total)")
-                    
-                    # Auto-decode the file if enabled (asynchronously if executor available)
-                    if self.decode_files:
-                        # Create output path mirroring the folder structure
-                        relative_path = os.path.relpath(event.src_path, self.monitor_folder)
-                        output_path = os.path.join(OUTPUT_BASE, relative_path)
-                        output_path = output_path.replace(".dat", ".jpg")
-                        
-                        # Create output directory if needed
-                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                        
-                        if self.executor:
-                            # Submit to thread pool for async processing
-                            print(f"  ⏳ Queued for decoding...")
-                            self.executor.submit(self.decode_file_async, event.src_path, output_path)
-                        else:
-                            # Fallback to synchronous decoding if no executor
-                            try:
-                                decode_wechat_dat(event.src_path, output_path)
-                                print(f"  ✓ Decoded to: {output_path}")
-                                
-                                # Auto-annotate if available
-                                if AUTO_ANNOTATION_AVAILABLE:
-                                    try:
-                                        store_name = self._get_store_name_from_path(event.src_path)
-                                        if store_name and os.path.exists(output_path):
-                                            annotations_file = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\image_annotations.json'
-                                            duplicates_report = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\duplicates_report.txt'
-                                            store_date_rules = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache\store_date_rules.csv'
-                                            
-                                            if auto_annotate_duplicate_image(output_path, store_name, annotations_file,
-                                                                             duplicates_report, store_date_rules):
-                                                print(f"  ✓ Auto-annotated: {os.path.basename(output_path)}")
-                                    except Exception:
-                                        pass  # Don't fail decoding if annotation fails
-                            except Exception as decode_error:
-                                print(f"  ✗ Decode failed: {decode_error}")
-            except Exception as e:
-                print(f"Error checking file time: {e}")
+        _handle_dat_file(self, event.src_path, "on_created")
     
     def on_modified(self, event):
         """Called when a file is modified"""
-        if event.is_directory:
+        # Skip on_modified for non-decoding modes (thumbnail mode)
+        # New thumbnails are already reported by on_created
+        if event.is_directory or not self.decode_files or not event.src_path.endswith(_DAT_SUFFIXES):
+            return
+        _handle_dat_file(self, event.src_path, "on_modified")
+
+
+def _handle_dat_file(handler, file_path, source, dir_entry=None):
+    """Process a newly seen .dat file for a handler
+    
+    Shared by on_created, on_modified and polling_scan so every detection
+    source goes through the same filtering, queueing and decoding logic.
+    
+    Args:
+        handler: DatFileHandler that owns the monitored folder
+        file_path: Full path of the .dat file
+        source: Detection method shown in the log (on_created/on_modified/polling)
+        dir_entry: Optional os.DirEntry for the file, reused to avoid extra stat calls
+    """
+    # For msgattach mode, only decode files in Image folders
+    if handler.decode_files and _IMAGE_SEG not in file_path:
+        return
+    
+    # Events for files this handler actually watches are getting through, so polling can wait
+    # (Thumb events in msgattach mode say nothing about the Image folders that are polled)
+    if source != "polling":
+        handler.last_event_time = time.monotonic()
+    
+    try:
+        # Skip if already seen by this run. No lock: if two observer threads race on the
+        # same path, the worst case is one duplicate (idempotent) decode
+        if file_path in handler.processed_files or not handler.processed_files.add(file_path):
             return
         
-        # Skip on_modified for non-decoding modes (thumbnail mode)
-        # These files will be caught by polling instead
-        if not self.decode_files:
+        # One stat call for both size and mtime (cached on the DirEntry when scanning)
+        try:
+            file_stat = dir_entry.stat() if dir_entry is not None else os.stat(file_path)
+        except OSError:
+            # If we can't stat the file, skip it
             return
         
-        if event.src_path.lower().endswith('.dat'):
-            # For msgattach mode, only decode files in Image folders
-            if self.decode_files and '\\Image\\' not in event.src_path:
+        # For thumbnail mode (decode_files=False), check file size
+        size_info = ""
+        if not handler.decode_files:
+            file_size = file_stat.st_size
+            # Skip files larger than 15KB for thumbnail mode
+            if file_size > 15 * 1024:  # 15KB in bytes
                 return
-            
-            try:
-                with self.lock:
-                    # Skip if already processed
-                    if event.src_path in self.processed_files:
-                        return
-                    self.processed_files.add(event.src_path)
-                
-                file_mtime = datetime.fromtimestamp(os.path.getmtime(event.src_path))
-                
-                # Only report if file is newer than baseline
-                if file_mtime >= self.baseline_time:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    file_time_str = file_mtime.strftime("%Y-%m-%d %H:%M:%S")
-                    folder_info = f" [{self.folder_label}]" if self.folder_label else ""
-                    
-                    # Get store name for msgattach mode
-                    store_name_info = ""
-                    if self.decode_files:
-                        store_name = self._get_store_name_from_path(event.src_path)
-                        if store_name:
-                            store_name_info = f" [{store_name}]"
-                    
-                    print(f"[{timestamp}]{folder_info}{store_name_info} .dat file detected (on_modified): {event.src_path}")
-                    print(f"  File timestamp: {file_time_str}")
-                    
-                    # Auto-decode the file if enabled (asynchronously if executor available)
-                    if self.decode_files:
-                        # Create output path mirroring the folder structure
-                        relative_path = os.path.relpath(event.src_path, self.monitor_folder)
-                        output_path = os.path.join(OUTPUT_BASE, relative_path)
-                        output_path = output_path.replace(".dat", ".jpg")
-                        
-                        # Create output directory if needed
-                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                        
-                        if self.executor:
-                            # Submit to thread pool for async processing
-                            print(f"  ⏳ Queued for decoding...")
-                            self.executor.submit(self.decode_file_async, event.src_path, output_path)
-                        else:
-                            # Fallback to synchronous decoding if no executor
-                            try:
-                                decode_wechat_dat(event.src_path, output_path)
-                                print(f"  ✓ Decoded to: {output_path}")
-                            except Exception as decode_error:
-                                print(f"  ✗ Decode failed: {decode_error}")
-            except Exception as e:
-                print(f"Error checking file time: {e}")
+            size_info = f" (size: {file_size / 1024:.1f} KB)"
+        
+        source_mtime = file_stat.st_mtime
+        
+        # Only report if file is newer than baseline
+        if source_mtime < handler.baseline_ts:
+            return
+        
+        # Skip files a previous run decoded from this exact source (same mtime and size)
+        if isinstance(handler.processed_files, ProcessedFileSet) and handler.processed_files.is_decoded(file_path, file_stat):
+            return
+        
+        timestamp = _format_ts()
+        file_time_str = _format_ts(source_mtime)
+        folder_info = f" [{handler.folder_label}]" if handler.folder_label else ""
+        
+        # Get store name for msgattach mode (the CSV mapping lives in this process)
+        store_name = None
+        store_name_info = ""
+        if handler.decode_files:
+            store_name = _store_name_from_path(file_path)
+            if store_name:
+                store_name_info = f" [{store_name}]"
+        
+        # One log record per detected file
+        logger.info("[%s]%s%s .dat file detected (%s): %s%s\n  File timestamp: %s",
+                    timestamp, folder_info, store_name_info, source, file_path, size_info, file_time_str)
+        
+        # For thumbnail mode, record activity (applied to the queue in batches by the queue processor)
+        if not handler.decode_files and handler.activity_tracker and handler.processing_queue:
+            handler.activity_tracker.record_activity(file_path)
+        
+        # Auto-decode the file if enabled (asynchronously if executor available)
+        if handler.decode_files:
+            if handler.executor:
+                # Submit to the process pool for async processing
+                logger.info("  ⏳ Queued for decoding...")
+            handler.decode_file_async(file_path, file_stat, store_name)
+    except Exception as e:
+        logger.info("Error checking file time: %s", e)
 
 
-def scan_existing_files(folder, baseline_time, folder_name="", decode_files=True, processed_files=None, activity_tracker=None, processing_queue=None):
-    """Scan for existing .dat files modified after baseline time"""
+def _iter_dat_files(folder, baseline_ts=None, dir_cache=None, image_only=False):
+    """Yield (directory, DirEntry) for every .dat file under folder
+    
+    Uses os.scandir so file types and (on Windows) stat data come from the
+    directory listing itself instead of a separate call per file.
+    
+    A folder's mtime only changes when entries are added to or removed from
+    that folder itself, so:
+    - files are not checked in folders untouched since baseline_ts
+    - with dir_cache (kept across polling sweeps), a folder whose mtime hasn't
+      changed is not listed again; its cached subfolders are walked instead
+    
+    With image_only (msgattach decoding), folder is MsgAttach and only the
+    <folder_id>/Image subtrees are walked, since only those files are decoded.
+    """
+    stack = [(folder, None, 0)]
+    while stack:
+        directory, dir_mtime, depth = stack.pop()
+        try:
+            # Taken before listing, so anything added meanwhile shows up next sweep
+            if dir_mtime is None:
+                dir_mtime = os.stat(directory).st_mtime
+        except OSError:
+            continue  # Skip folders we can't access
+        
+        if dir_cache is not None:
+            cached = dir_cache.get(directory)
+            if cached is not None and cached[0] == dir_mtime:
+                stack.extend((subdir, None, depth + 1) for subdir in cached[1])
+                continue
+        
+        check_files = baseline_ts is None or dir_mtime >= baseline_ts
+        if image_only and depth < 2:
+            check_files = False  # Above MsgAttach/<folder_id>/Image - nothing to decode here
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if image_only and depth == 1 and entry.name != 'Image':
+                            continue  # Prune Thumb/File/Video subtrees
+                        subdirs.append(entry.path)
+                        stack.append((entry.path, entry.stat(follow_symlinks=False).st_mtime, depth + 1))
+                    elif check_files and entry.name.endswith(_DAT_SUFFIXES):
+                        yield directory, entry
+        except OSError:
+            continue  # Skip folders we can't access
+        
+        if dir_cache is not None:
+            dir_cache[directory] = (dir_mtime, subdirs)
+
+
+def scan_existing_files(folder, baseline_time, folder_name="", decode_files=True, processed_files=None, activity_tracker=None, processing_queue=None, handler=None):
+    """Scan for existing .dat files modified after baseline time
+    
+    Files to decode are submitted through handler (its process pool and decode
+    slots), the same path live events take; without one they are decoded in turn.
+    """
     folder_label = f" in {folder_name}" if folder_name else ""
-    print(f"Scanning{folder_label} for existing .dat files modified after {baseline_time.strftime('%Y-%m-%d %H:%M:%S')}...\n")
+    logger.info("Scanning%s for existing .dat files modified after %s...\n", folder_label, baseline_time.strftime('%Y-%m-%d %H:%M:%S'))
 
     if processed_files is None:
-        processed_files = set()
+        processed_files = BoundedSet()
+    if decode_files and handler is None:
+        handler = DatFileHandler(baseline_time, folder, decode_files, folder_name, processed_files)
 
     found_count = 0
-    decoded_count = 0
-    for root, dirs, files in os.walk(folder):
-        for file in files:
-            if file.lower().endswith('.dat'):
-                file_path = os.path.join(root, file)
-                try:
-                    file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-
-                    if file_mtime >= baseline_time:
-                        file_time_str = file_mtime.strftime("%Y-%m-%d %H:%M:%S")
-                        print(f"Found: {file_path}")
-                        print(f"  File timestamp: {file_time_str}")
-                        found_count += 1
-
-                        # Mark as processed
-                        processed_files.add(file_path)
-
-                        # For thumbnail mode, update activity tracker and queue
-                        if not decode_files and activity_tracker and processing_queue:
-                            # Check file size for thumbnail mode
-                            try:
-                                file_size = os.path.getsize(file_path)
-                                # Skip files larger than 15KB for thumbnail mode
-                                if file_size > 15 * 1024:  # 15KB in bytes
-                                    print(f"  Skipping file (size: {file_size/1024:.1f} KB > 15KB limit)")
-                                    continue
-                                else:
-                                    size_info = f" (size: {file_size/1024:.1f} KB)"
-                                    print(f"  File size: {file_size/1024:.1f} KB")
-                            except Exception as size_error:
-                                print(f"  Could not get file size: {size_error}")
-                                continue
-
-                            # Update activity tracker and queue
-                            folder_id, store_name = activity_tracker.update_activity(file_path)
-                            if folder_id and store_name:
-                                processing_queue.add_or_update(folder_id, store_name)
-                                file_count = activity_tracker.get_file_count(folder_id)
-
-                                # Check if currently processing this folder
-                                if processing_queue.mark_new_activity_during_processing(folder_id):
-                                    print(f"  ⚠️  Still processing - will re-queue after completion")
-                                else:
-                                    queue_pos = len(processing_queue.queue_items)
-                                    print(f"  ⏭️  Added to processing queue (position: {queue_pos}, {file_count} files total)")
-
-                        # Auto-decode the file if enabled
-                        if decode_files:
-                            try:
-                                # Create output path mirroring the folder structure
-                                relative_path = os.path.relpath(file_path, folder)
-                                output_path = os.path.join(OUTPUT_BASE, relative_path)
-                                output_path = output_path.replace(".dat", ".jpg")
-
-                                # Create output directory if needed
-                                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-                                # Decode the file
-                                decode_wechat_dat(file_path, output_path)
-                                print(f"  ✓ Decoded to: {output_path}")
-                                decoded_count += 1
-                                
-                                # Auto-annotate if available
-                                if AUTO_ANNOTATION_AVAILABLE:
-                                    try:
-                                        # Get store name from path
-                                        parts = file_path.split(os.sep)
-                                        store_name = None
-                                        if 'MsgAttach' in parts:
-                                            msgattach_idx = parts.index('MsgAttach')
-                                            if msgattach_idx + 1 < len(parts):
-                                                folder_id = parts[msgattach_idx + 1]
-                                                # Try to get store name from CSV
-                                                if os.path.exists(CSV_FILE):
-                                                    try:
-                                                        with open(CSV_FILE, 'r', encoding='utf-8') as f:
-                                                            reader = csv.DictReader(f)
-                                                            for row in reader:
-                                                                if row['Folder'] == folder_id:
-                                                                    store_name = row['Store']
-                                                                    break
-                                                    except:
-                                                        pass
-                                                if not store_name:
-                                                    store_name = folder_id
-                                        
-                                        if store_name and os.path.exists(output_path):
-                                            annotations_file = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\image_annotations.json'
-                                            duplicates_report = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache_data\duplicates_report.txt'
-                                            store_date_rules = r'C:\Users\henry\source\repos\asian_grocer_scrapers\cache\store_date_rules.csv'
-                                            
-                                            if auto_annotate_duplicate_image(output_path, store_name, annotations_file,
-                                                                             duplicates_report, store_date_rules):
-                                                print(f"  ✓ Auto-annotated: {os.path.basename(output_path)}")
-                                    except Exception:
-                                        pass  # Don't fail decoding if annotation fails
-                            except Exception as decode_error:
-                                print(f"  ✗ Decode failed: {decode_error}")
-                except Exception as e:
-                    print(f"Error reading {file_path}: {e}")
+    submitted_count = 0
+    baseline_ts = baseline_time.timestamp()
+    for directory, entry in _iter_dat_files(folder, baseline_ts):
+        file_path = entry.path
+        
+        # Skip files already seen by this run
+        if file_path in processed_files:
+            continue
+        
+        try:
+            file_stat = entry.stat()
+
+            if file_stat.st_mtime >= baseline_ts:
+                # Skip files a previous run decoded from this exact source (same mtime and size)
+                if isinstance(processed_files, ProcessedFileSet) and processed_files.is_decoded(file_path, file_stat):
+                    continue
+                
+                # Running total between files, so it doesn't split one file's lines
+                if found_count and found_count % SCAN_PROGRESS_EVERY == 0:
+                    logger.info("[Scan] %d file(s) found so far%s", found_count, folder_label)
+                
+                # One log record per found file
+                logger.info("Found: %s\n  File timestamp: %s", file_path, _format_ts(file_stat.st_mtime))
+                found_count += 1
+
+                # Mark as seen for this run
+                processed_files.add(file_path)
+
+                # For thumbnail mode, update activity tracker and queue
+                if not decode_files and activity_tracker and processing_queue:
+                    # Check file size for thumbnail mode
+                    try:
+                        file_size = file_stat.st_size
+                        # Skip files larger than 15KB for thumbnail mode
+                        if file_size > 15 * 1024:  # 15KB in bytes
+                            logger.info("  Skipping file (size: %.1f KB > 15KB limit)", file_size / 1024)
+                            continue
+                        else:
+                            size_info = f" (size: {file_size/1024:.1f} KB)"
+                            logger.info("  File size: %.1f KB", file_size / 1024)
+                    except Exception as size_error:
+                        logger.info("  Could not get file size: %s", size_error)
+                        continue
+
+                    # Record activity (applied to the queue in batches by the queue processor)
+                    activity_tracker.record_activity(file_path)
+
+                # Auto-decode the file if enabled (the outcome is logged when the worker finishes)
+                if decode_files:
+                    handler.decode_file_async(file_path, file_stat, _store_name_from_path(file_path))
+                    submitted_count += 1
+        except Exception as e:
+            logger.info("Error reading %s: %s", file_path, e)
 
     if found_count > 0:
-        print(f"\nFound {found_count} existing .dat file(s){folder_label} modified after baseline time.")
+        logger.info("\nFound %d existing .dat file(s)%s modified after baseline time.", found_count, folder_label)
         if decode_files:
-            print(f"Successfully decoded {decoded_count} file(s).\n")
+            logger.info("Submitted %d file(s) for decoding.\n", submitted_count)
         else:
-            print()
+            logger.info("")
     else:
-        print(f"No existing .dat files found{folder_label} after baseline time.\n")
+        logger.info("No existing .dat files found%s after baseline time.\n", folder_label)
 
 
-def polling_scan(folders_dict, baseline_time, decode_files, handlers_dict, stop_event, poll_interval=5):
+def polling_scan(folders_dict, baseline_time, decode_files, handlers_dict, stop_event, poll_interval=POLL_INTERVAL_SECONDS):
     """
     Periodically scan folders for new .dat files that might have been missed by event handlers.
-    This catches files that the watchdog on_created event might miss on Windows.
+    Only started for OneDrive placeholder folders, where watchdog events can be missed on Windows.
+    A folder is skipped while its handler has had a .dat event within POLL_QUIET_SECONDS.
     """
-    while not stop_event.is_set():
-        time.sleep(poll_interval)
-        
+    baseline_ts = baseline_time.timestamp()
+    dir_caches = {folder_name: {} for folder_name in folders_dict}  # folder mtimes/subfolders from previous sweeps
+    
+    # Returns early (True) as soon as stop_event is set
+    while not stop_event.wait(poll_interval):
         for folder_name, folder_path in folders_dict.items():
             handler = handlers_dict.get(folder_name)
             if not handler:
                 continue
             
+            # Events are arriving for this folder, so there's nothing to back up yet
+            if time.monotonic() - handler.last_event_time < POLL_QUIET_SECONDS:
+                continue
+            
             try:
-                for root, dirs, files in os.walk(folder_path):
-                    for file in files:
-                        if file.lower().endswith('.dat'):
-                            file_path = os.path.join(root, file)
-                            
-                            # For msgattach mode, only decode files in Image folders
-                            if decode_files and '\\Image\\' not in file_path:
-                                continue
-                            
-                            # Check if already processed
-                            with handler.lock:
-                                if file_path in handler.processed_files:
-                                    continue
-                                
-                                # For thumbnail mode, check file size
-                                if not decode_files:
-                                    try:
-                                        file_size = os.path.getsize(file_path)
-                                        # Skip files larger than 15KB for thumbnail mode
-                                        if file_size > 15 * 1024:  # 15KB in bytes
-                                            continue
-                                    except:
-                                        continue
-                                
-                                # Check file modification time
-                                try:
-                                    file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-                                    
-                                    if file_mtime >= baseline_time:
-                                        # Mark as processed first to avoid race condition
-                                        handler.processed_files.add(file_path)
-                                        
-                                        # Report the file
-                                        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                        file_time_str = file_mtime.strftime("%Y-%m-%d %H:%M:%S")
-                                        folder_info = f" [{folder_name}]" if folder_name else ""
-                                        
-                                        # Show file size for thumbnail mode
-                                        size_info = ""
-                                        if not decode_files:
-                                            try:
-                                                file_size = os.path.getsize(file_path)
-                                                size_kb = file_size / 1024
-                                                size_info = f" (size: {size_kb:.1f} KB)"
-                                            except:
-                                                pass
-                                        
-                                        print(f"[{timestamp}]{folder_info} .dat file detected (polling): {file_path}{size_info}")
-                                        print(f"  File timestamp: {file_time_str}")
-                                        
-                                        # For thumbnail mode, update activity tracker and queue
-                                        if not decode_files and handler.activity_tracker and handler.processing_queue:
-                                            folder_id, store_name = handler.activity_tracker.update_activity(file_path)
-                                            if folder_id and store_name:
-                                                handler.processing_queue.add_or_update(folder_id, store_name)
-                                                file_count = handler.activity_tracker.get_file_count(folder_id)
-                                                
-                                                # Check if currently processing this folder
-                                                if handler.processing_queue.mark_new_activity_during_processing(folder_id):
-                                                    print(f"  ⚠️  Still processing - will re-queue after completion")
-                                                else:
-                                                    queue_pos = len(handler.processing_queue.queue_items)
-                                                    print(f"  ⏭️  Added to processing queue (position: {queue_pos}, {file_count} files total)")
-                                        
-                                        # Auto-decode the file if enabled
-                                        if decode_files:
-                                            try:
-                                                relative_path = os.path.relpath(file_path, folder_path)
-                                                output_path = os.path.join(OUTPUT_BASE, relative_path)
-                                                output_path = output_path.replace(".dat", ".jpg")
-                                                
-                                                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                                                decode_wechat_dat(file_path, output_path)
-                                                print(f"  ✓ Decoded to: {output_path}")
-                                                
-                                                # Auto-annotate if available
-                                                if AUTO_ANNOTATION_AVAILABLE:
-                                                    try:
-                                                        # Get store name from path
-                                                        parts = file_path.split(os.sep)
-                                                        store_name = None
-                                                        if 'MsgAttach' in parts:
-                                                            msgattach_idx = parts.index('MsgAttach')
-                                                            if msgattach_idx + 1 < len(parts):
-                                                                folder_id = parts[msgattach_idx + 1]
-                                                                # Try to get store name from CSV
-                                                                if os.path.exists(CSV_FILE):
-                                                                    try:
-                                                                        with open(CSV_FILE, 'r', encoding='utf-8') as f:
-                                                                            reader = csv.DictReader(f)
-                                                                            for row in reader:
-                                                                                if row['Folder'] == folder_id:
-                                                                                    store_name = row['Store']
-                                                                                    break
-                                                                    except:
-                                                                        pass
-                                                                if not store_name:
-                                                                    store_name = folder_id
-                                                        
-                                                        if store_name and os.path.exists(output_path):
-                                                            annotations_file = r'C:\Users\henry\source\repos\asian_grocer_scrapers\image_annotations.json'
-                                                            duplicates_report = r'C:\Users\henry\source\repos\asian_grocer_scrapers\duplicates_report.txt'
-                                                            store_date_rules = r'C:\Users\henry\source\repos\asian_grocer_scrapers\store_date_rules.csv'
-                                                            
-                                                            if auto_annotate_duplicate_image(output_path, store_name, annotations_file,
-                                                                                             duplicates_report, store_date_rules):
-                                                                print(f"  ✓ Auto-annotated: {os.path.basename(output_path)}")
-                                                    except Exception:
-                                                        pass  # Don't fail decoding if annotation fails
-                                            except Exception as decode_error:
-                                                print(f"  ✗ Decode failed: {decode_error}")
-                                except Exception as e:
-                                    pass  # Skip files we can't read
+                for directory, entry in _iter_dat_files(folder_path, baseline_ts, dir_caches[folder_name], image_only=decode_files):
+                    _handle_dat_file(handler, entry.path, "polling", entry)
             except Exception as e:
                 pass  # Skip folders we can't access
 
 
 def queue_processor_thread(processing_queue, stop_event):
     """Background thread that processes the queue of folders"""
-    print("[Queue Processor] Started\n")
+    logger.info("[Queue Processor] Started\n")
     
     while not stop_event.is_set():
         try:
+            # Pick up CSV mapping edits (the shared map is only re-read when its mtime changes)
+            _get_folder_map()
+            
+            # Apply file activity recorded since the last check
+            processing_queue.apply_pending_activity()
+            
             # Debug: Show current queue state
             queue_status = processing_queue.get_queue_status()
             if queue_status:
-                print(f"[Queue Debug] Current queue: {len(queue_status)} folders")
+                logger.info("[Queue Debug] Current queue: %d folders", len(queue_status))
                 for item in queue_status:
-                    print(f"  - {item['store_name']}: {item['file_count']} files, {item['idle_time']:.0f}s idle, processing={item['processing']}")
+                    logger.info("  - %s: %d files, %.0fs idle, processing=%s", item['store_name'], item['file_count'], item['idle_time'], item['processing'])
             
-            # Check queue for next item to process
-            next_item = processing_queue.get_next_to_process()
+            # Check queue for all chats ready to process (handled in one navigator run)
+            ready_items = processing_queue.get_all_ready_to_process()
             
-            if next_item:
-                folder_id = next_item['folder_id']
-                store_name = next_item['store_name']
-                idle_time = next_item['idle_time']
-                file_count = next_item['file_count']
+            if ready_items:
+                store_names = [item['store_name'] for item in ready_items]
+                file_counts = [str(item['file_count']) for item in ready_items]
+                batch_label = ", ".join(store_names)
                 
-                print(f"\n{'='*60}")
-                print(f"[Queue] {store_name} has been idle for {idle_time:.0f} seconds")
-                print(f"[Queue] Processing {file_count} files from {store_name}")
+                logger.info("\n%s", '=' * 60)
+                for item in ready_items:
+                    logger.info("[Queue] %s has been idle for %.0f seconds", item['store_name'], item['idle_time'])
+                    logger.info("[Queue] Processing %d files from %s", item['file_count'], item['store_name'])
                 
                 # Show current queue status
                 queue_status = processing_queue.get_queue_status()
@@ -781,55 +978,49 @@ def queue_processor_thread(processing_queue, stop_event):
                     f"{item['store_name']} ({'processing' if item['processing'] else str(int(item['idle_time'])) + 's idle'})"
                     for item in queue_status[:5]  # Show first 5
                 ])
-                print(f"[Queue] Status: [{status_str}]")
-                print(f"{'='*60}")
+                logger.info("[Queue] Status: [%s]", status_str)
+                logger.info("%s", '=' * 60)
                 
                 # Start auto-navigation Python script directly
-                print(f"[Queue] 🚀 Starting: python wechat_auto_navigator.py --chat {store_name} --prod --file-count {file_count}\n")
+                logger.info("[Queue] 🚀 Starting: python wechat_auto_navigator.py --prod --chats %s --file-counts %s\n",
+                            " ".join(store_names), " ".join(file_counts))
                 
+                timeout = NAVIGATOR_TIMEOUT_SECONDS * len(ready_items)
                 try:
-                    # Run the Python script directly with the store name, prod mode, and file count
+                    # Run the Python script once for the whole batch, with prod mode and each chat's file count.
+                    # Its output goes straight to our console as it runs instead of being buffered until it exits;
+                    # on timeout subprocess.run kills it
                     result = subprocess.run(
-                        ['python', 'wechat_auto_navigator.py', '--chat', store_name, '--prod', '--file-count', str(file_count)],
-                        capture_output=True,
-                        text=True,
-                        encoding='utf-8',
-                        timeout=600  # 10 minute timeout
+                        [sys.executable, NAVIGATOR_SCRIPT, '--prod', '--chats', *store_names, '--file-counts', *file_counts],
+                        timeout=timeout
                     )
 
-                    # Print any output from the navigator script
-                    if result.stdout:
-                        print(f"[Navigator Output for {store_name}]")
-                        print(result.stdout)
-                    if result.stderr:
-                        print(f"[Navigator Errors for {store_name}]")
-                        print(result.stderr)
-
-                    print(f"\n[Queue] ✓ Completed processing {store_name}")
+                    logger.info("\n[Queue] ✓ Completed processing %s", batch_label)
                     if result.returncode != 0:
-                        print(f"[Queue] ⚠️  Exit code: {result.returncode}")
+                        logger.info("[Queue] ⚠️  Exit code: %d", result.returncode)
                     
                 except subprocess.TimeoutExpired:
-                    print(f"\n[Queue] ⚠️  Timeout processing {store_name} (10 minutes)")
+                    logger.info("\n[Queue] ⚠️  Timeout processing %s (%d minutes)", batch_label, timeout // 60)
                 except Exception as e:
-                    print(f"\n[Queue] ✗ Error processing {store_name}: {e}")
-                
-                # Mark as finished
-                needs_reprocessing = processing_queue.finish_processing(folder_id)
+                    logger.info("\n[Queue] ✗ Error processing %s: %s", batch_label, e)
                 
-                if not needs_reprocessing:
-                    print(f"[Queue] ✅ {store_name} completed and removed from queue")
+                # Apply activity that arrived while processing, then mark each chat as finished
+                processing_queue.apply_pending_activity()
+                for item in ready_items:
+                    needs_reprocessing = processing_queue.finish_processing(item['folder_id'])
+                    if not needs_reprocessing:
+                        logger.info("[Queue] ✅ %s completed and removed from queue", item['store_name'])
                 
-                print()
+                logger.info("")
             
-            # Sleep before checking again
-            time.sleep(QUEUE_CHECK_INTERVAL)
+            # Wait before checking again (returns early on shutdown)
+            stop_event.wait(QUEUE_CHECK_INTERVAL)
             
         except Exception as e:
-            print(f"[Queue Processor] Error: {e}")
-            time.sleep(QUEUE_CHECK_INTERVAL)
+            logger.info("[Queue Processor] Error: %s", e)
+            stop_event.wait(QUEUE_CHECK_INTERVAL)
     
-    print("[Queue Processor] Stopped")
+    logger.info("[Queue Processor] Stopped")
 
 
 def parse_arguments():
@@ -850,6 +1041,9 @@ Examples:
     
   python wechat_file_monitor.py --folder thumbnail --start-time "20241104 10:30"
     Monitor Thumbnail folder after Nov 4, 2024 10:30 AM
+    
+  python wechat_file_monitor.py --polling
+    Monitor MsgAttach folder on a network share using stat polling
         '''
     )
     
@@ -867,12 +1061,27 @@ Examples:
         help='Start time in format "YYYYmmdd HH:MM" (e.g., "20241104 10:30")'
     )
     
+    parser.add_argument(
+        '--polling',
+        action='store_true',
+        default=False,
+        help='Use stat polling instead of native file system events (only for NFS/CIFS network shares)'
+    )
+    
     return parser.parse_args()
 
 
-def start_monitoring(baseline_time=None, folder_choice='msgattach'):
+def start_monitoring(baseline_time=None, folder_choice='msgattach', use_polling=False):
     """Start monitoring the selected folder(s) for new .dat files"""
     
+    # Main-process setup only (decode workers re-import this module without calling this)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    if sys.platform == 'win32':
+        winapi.WATCHDOG_FILE_NOTIFY_FLAGS = WATCHDOG_NOTIFY_FLAGS
+    if not AUTO_ANNOTATION_AVAILABLE:
+        logger.info("[Warning] Auto-annotation module not available")
+    
     # Use current time if no baseline provided
     if baseline_time is None:
         baseline_time = datetime.now()
@@ -883,7 +1092,7 @@ def start_monitoring(baseline_time=None, folder_choice='msgattach'):
         thumb_folders = get_all_thumb_folders()
         
         if not thumb_folders:
-            print("Error: No Thumb folders found in CSV or folders don't exist")
+            logger.info("Error: No Thumb folders found in CSV or folders don't exist")
             return
         
         folders_to_monitor = thumb_folders  # Dict: {store_name: folder_path}
@@ -902,33 +1111,51 @@ def start_monitoring(baseline_time=None, folder_choice='msgattach'):
         if os.path.exists(path):
             existing_folders[name] = path
         else:
-            print(f"Warning: Folder does not exist for {name}: {path}")
+            logger.info("Warning: Folder does not exist for %s: %s", name, path)
     
     if not existing_folders:
-        print("Error: No valid folders to monitor")
+        logger.info("Error: No valid folders to monitor")
         return
     
-    print(f"WeChat File Monitor")
-    print(f"=" * 50)
-    print(f"Mode: {mode_name} - {'Print only' if not decode_files else 'Decode to JPG'}")
-    print(f"Baseline time: {baseline_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Monitoring {len(existing_folders)} folder(s):")
+    # Only OneDrive placeholder folders need the polling backup (not needed with a polling observer)
+    poll_folders = {}
+    if not use_polling:
+        poll_folders = {name: path for name, path in existing_folders.items() if is_onedrive_placeholder(path)}
+    
+    logger.info("WeChat File Monitor")
+    logger.info("%s", "=" * 50)
+    logger.info("Mode: %s - %s", mode_name, 'Print only' if not decode_files else 'Decode to JPG')
+    logger.info("Baseline time: %s", baseline_time.strftime('%Y-%m-%d %H:%M:%S'))
+    logger.info("Monitoring %d folder(s):", len(existing_folders))
     for name, path in existing_folders.items():
-        print(f"  [{name}]: {path}")
-    print(f"Detection: Event-based + Polling backup (every 5s)")
+        logger.info("  [%s]: %s", name, path)
+    if poll_folders:
+        logger.info("Detection: Event-based + Polling backup for %d OneDrive placeholder folder(s) (every %ds after %ds without events)",
+                    len(poll_folders), POLL_INTERVAL_SECONDS, POLL_QUIET_SECONDS)
+    else:
+        logger.info("Detection: Event-based")
+    observer_name = f"PollingObserver (every {POLLING_OBSERVER_TIMEOUT:g}s)" if use_polling else NativeObserver.__name__
+    logger.info("Observer: %s", observer_name)
     if decode_files:
-        print(f"Decoding: Async thread pool (max 4 concurrent)")
-    print(f"=" * 50)
-    print()
+        logger.info("Decoding: Async process pool (max %d concurrent)", DECODE_WORKERS)
+    logger.info("%s", "=" * 50)
+    logger.info("")
+    
+    # Load the CSV folder mapping (store names for logs and auto-annotation)
+    _get_folder_map()
     
-    # Create shared processed files set
-    processed_files = set()
+    # Create shared processed files set (decoded files are persisted across restarts;
+    # in thumbnail mode detected files feed the in-memory queue, so they aren't persisted)
+    processed_files = ProcessedFileSet() if decode_files else BoundedSet()
     
-    # Create thread pool executor for async decoding (only for msgattach mode)
+    # Create process pool executor for async decoding (only for msgattach mode);
+    # decoding is CPU-bound, so threads would just take turns holding the GIL
     executor = None
+    decode_slots = None
     if decode_files:
-        executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="Decoder")
-        print("✓ Async decoding thread pool initialized (4 workers)\n")
+        executor = ProcessPoolExecutor(max_workers=DECODE_WORKERS)
+        decode_slots = threading.BoundedSemaphore(DECODE_QUEUE_SIZE)
+        logger.info("✓ Async decoding process pool initialized (%d workers)\n", DECODE_WORKERS)
     
     # Create activity tracker and processing queue (only for thumbnail mode)
     activity_tracker = None
@@ -937,39 +1164,44 @@ def start_monitoring(baseline_time=None, folder_choice='msgattach'):
     if not decode_files:  # Thumbnail mode
         activity_tracker = FolderActivityTracker()
         processing_queue = ProcessingQueue(activity_tracker)
-        print(f"✓ Auto-navigation queue initialized")
-        print(f"  - Idle threshold: {IDLE_THRESHOLD_SECONDS}s")
-        print(f"  - Min files to process: {MIN_FILES_TO_PROCESS}")
-        print(f"  - Queue check interval: {QUEUE_CHECK_INTERVAL}s\n")
+        logger.info("✓ Auto-navigation queue initialized")
+        logger.info("  - Idle threshold: %ds", IDLE_THRESHOLD_SECONDS)
+        logger.info("  - Min files to process: %d", MIN_FILES_TO_PROCESS)
+        logger.info("  - Queue check interval: %ds\n", QUEUE_CHECK_INTERVAL)
     
-    # First, scan for existing files in all folders
-    for name, path in existing_folders.items():
-        scan_existing_files(path, baseline_time, name, decode_files, processed_files, activity_tracker, processing_queue)
-    
-    print("Starting continuous monitoring...")
-    print("Press Ctrl+C to stop monitoring\n")
-    
-    # Create event handlers and observer for each folder
-    observer = Observer()
+    # Create event handlers and spread folders across observers so event dispatch
+    # isn't serialized through a single thread (capped at one observer per CPU)
+    observer_count = min(len(existing_folders), os.cpu_count() or 1)
+    observers = [create_observer(use_polling) for _ in range(observer_count)]
     handlers_dict = {}
-    for name, path in existing_folders.items():
+    for i, (name, path) in enumerate(existing_folders.items()):
         event_handler = DatFileHandler(baseline_time, path, decode_files, folder_label=name, 
-                                       processed_files=processed_files, executor=executor,
+                                       processed_files=processed_files, executor=executor, decode_slots=decode_slots,
                                        activity_tracker=activity_tracker, processing_queue=processing_queue)
         handlers_dict[name] = event_handler
-        observer.schedule(event_handler, path, recursive=True)
+        observers[i % observer_count].schedule(event_handler, path, recursive=True)
+    
+    # First, scan for existing files in all folders (decodes go to the handlers' process pool)
+    for name, path in existing_folders.items():
+        scan_existing_files(path, baseline_time, name, decode_files, processed_files, activity_tracker, processing_queue, handlers_dict[name])
+    
+    logger.info("Starting continuous monitoring...")
+    logger.info("Press Ctrl+C to stop monitoring\n")
     
     # Start monitoring
-    observer.start()
+    for observer in observers:
+        observer.start()
     
-    # Start polling thread to catch files missed by events
+    # Start polling thread to catch files missed by events (OneDrive placeholders only)
     stop_event = threading.Event()
-    polling_thread = threading.Thread(
-        target=polling_scan,
-        args=(existing_folders, baseline_time, decode_files, handlers_dict, stop_event),
-        daemon=True
-    )
-    polling_thread.start()
+    polling_thread = None
+    if poll_folders:
+        polling_thread = threading.Thread(
+            target=polling_scan,
+            args=(poll_folders, baseline_time, decode_files, handlers_dict, stop_event),
+            daemon=True
+        )
+        polling_thread.start()
     
     # Start queue processor thread for thumbnail mode
     queue_thread = None
@@ -981,30 +1213,48 @@ def start_monitoring(baseline_time=None, folder_choice='msgattach'):
         )
         queue_thread.start()
     
+    # Ctrl+C only sets stop_event; the main thread sleeps on it instead of waking every second.
+    # The default handler is put back right away, so a second Ctrl+C still interrupts a hung shutdown
+    def request_stop(signum, frame):
+        stop_event.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    
+    signal.signal(signal.SIGINT, request_stop)
     try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\nStopping monitor...")
+        if sys.platform == 'win32':
+            # Lock waits can't be interrupted by Ctrl+C on Windows, so the signal
+            # handler only runs once the wait times out
+            while not stop_event.wait(1):
+                pass
+        else:
+            stop_event.wait()
+    finally:
+        logger.info("\nStopping monitor...")
         stop_event.set()
-        observer.stop()
+        for observer in observers:
+            observer.stop()
     
-    observer.join()
-    polling_thread.join(timeout=2)
+    for observer in observers:
+        observer.join()
+    if polling_thread:
+        polling_thread.join(timeout=2)
     
     # Wait for queue processor to finish current task
     if queue_thread:
-        print("Waiting for queue processor to finish...")
+        logger.info("Waiting for queue processor to finish...")
         queue_thread.join(timeout=5)
-        print("Queue processor stopped.")
+        logger.info("Queue processor stopped.")
     
     # Shutdown executor and wait for pending tasks
     if executor:
-        print("Waiting for pending decoding tasks to complete...")
+        logger.info("Waiting for pending decoding tasks to complete...")
         executor.shutdown(wait=True, cancel_futures=False)
-        print("All decoding tasks completed.")
+        logger.info("All decoding tasks completed.")
     
-    print("Monitor stopped.")
+    if isinstance(processed_files, ProcessedFileSet):
+        processed_files.close()
+    
+    logger.info("Monitor stopped.")
 
 
 if __name__ == "__main__":
@@ -1025,7 +1275,7 @@ if __name__ == "__main__":
         baseline_time = datetime.now()
         print(f"No start time provided. Using current time: {baseline_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    start_monitoring(baseline_time, args.folder)
+    start_monitoring(baseline_time, args.folder, args.polling)
 
 
 r"""
@@ -1054,6 +1304,11 @@ COMMAND LINE OPTIONS:
     Format: "YYYYmmdd HH:MM" (e.g., "20241105 14:30")
     If not provided, uses current time as baseline.
 
+--polling
+    Use watchdog's PollingObserver (stat sweep every 2 seconds) instead of the native
+    backend (ReadDirectoryChangesW on Windows, inotify on Linux).
+    Only needed when the folders live on a network share (NFS/CIFS) without change notifications.
+
 USAGE EXAMPLES:
 ---------------
 
@@ -1088,23 +1343,25 @@ BEHAVIOR:
 ---------
 1. On startup:
    - Displays configuration (folder, mode, baseline time)
-   - Initializes async thread pool (4 workers) for MsgAttach mode
+   - Initializes async process pool (one worker per CPU) for MsgAttach mode
    - Scans for existing files modified after baseline time
    - Reports found files and decodes them (if MsgAttach mode)
 
 2. During monitoring:
-   - Uses DUAL detection method for reliability:
+   - Uses event-based detection with a polling backup where needed:
      a) Event-based: Watches for on_created and on_modified events in real-time
-     b) Polling backup: Scans every 5 seconds to catch files missed by events
+     b) Polling backup: Scans OneDrive placeholder folders every 30 seconds to catch
+        files missed by events (not started when no placeholder folders are found;
+        a folder is skipped while its events are still arriving, within the last 60 seconds)
    - Reports files with detection method in the log (on_created/on_modified/polling)
    - Prevents duplicate processing using shared tracking set
    - MsgAttach mode behavior:
      * Files are immediately detected and reported
-     * Decoding happens asynchronously in background thread pool
+     * Decoding happens asynchronously in a background process pool
      * Shows "⏳ Queued for decoding..." immediately
      * Shows "✓ Decoded" with timestamp when complete
      * Can handle burst of files without blocking
-     * Up to 4 files decoded concurrently
+     * Up to one file per CPU decoded concurrently
    - Thumbnail mode behavior:
      * Only prints file names (no decoding)
      * Shows file size in KB